@@ -0,0 +1,49 @@
+from typing import NamedTuple
+
+
+# -----------------------------
+# Fixed model parameters (as provided)
+# -----------------------------
+class FR1Params(NamedTuple):
+    a: float
+    b: float
+    c: float
+    d: float
+    const: float
+
+
+class FR3Params(NamedTuple):
+    a: float
+    b: float
+    c: float
+    d: float
+    e: float
+    f: float
+    const: float
+
+
+PARAMS_FR1 = FR1Params(a=6.939, b=0.448, c=0.377, d=0.265, const=-3.823)
+PARAMS_FR3 = FR3Params(a=12.000, b=0.613, c=0.370, d=0.247, e=0.411, f=0.313, const=-1.506)
+
+# Reliability-based scaling (EN 1990 Annex C calibration; Code 2)
+SCALE = {
+    "fR1": {"k_char": 0.67, "k_design": 0.49, "gamma": 1.36},
+    "fR3": {"k_char": 0.62, "k_design": 0.43, "gamma": 1.45},
+}
+
+# -----------------------------
+# Fixed validity limits (dataset-based) - NOT editable
+# -----------------------------
+FC_MIN, FC_MAX = 22.0, 79.0          # MPa (matrix strength)
+VF_PCT_MIN, VF_PCT_MAX = 0.2, 2.0    # percent
+VF_DEC_MIN, VF_DEC_MAX = 0.002, 0.02 # decimal
+LAMBDA_MIN, LAMBDA_MAX = 38.0, 100.0 # lf/df
+FFU_MIN, FFU_MAX = 1000.0, 3200.0   # MPa
+
+# Fibre type note (must match dataset used for calibration)
+FIBRE_TYPE_NOTE = (
+    "3D Hooked-end steel fibres (as in the experimental dataset used for model development/calibration)."
+)
+
+# fc - fcu conversion (rough)
+FC_FROM_FCU = 0.82
@@ -0,0 +1,325 @@
+import functools
+import hashlib
+import math
+import os
+import tempfile
+from typing import TYPE_CHECKING, Union
+
+import numba
+import numpy as np
+from numba import float64, njit, vectorize
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+from constants import (
+    FC_MAX,
+    FC_MIN,
+    FFU_MAX,
+    FFU_MIN,
+    LAMBDA_MAX,
+    LAMBDA_MIN,
+    PARAMS_FR1,
+    PARAMS_FR3,
+    VF_DEC_MAX,
+    VF_DEC_MIN,
+)
+
+# Kept in a separate module: Streamlit re-executes the app script on every
+# rerun, but imported modules (and their compiled kernels) persist.
+
+# Where cache=True kernels are stored. Set NUMBA_CACHE_DIR to a persistent
+# volume in containers so cold starts skip the JIT. The cached kernels
+# freeze the coefficients from constants.py, but numba only invalidates its
+# cache when this file changes, so the directory is keyed on the coefficients.
+_CACHE_BASE = numba.config.CACHE_DIR or os.path.join(tempfile.gettempdir(), "sfrc_numba_cache")
+_PARAMS_DIGEST = hashlib.sha1(repr((PARAMS_FR1, PARAMS_FR3)).encode()).hexdigest()[:12]
+_CACHE_DIR = os.path.join(_CACHE_BASE, f"params-{_PARAMS_DIGEST}")
+
+
+def _keyed_cache(decorator):
+    # numba fixes a kernel's cache path when the decorator is applied, so the
+    # process-wide CACHE_DIR only points at the keyed directory meanwhile
+    def apply(func):
+        previous = numba.config.CACHE_DIR
+        numba.config.CACHE_DIR = _CACHE_DIR
+        try:
+            return decorator(func)
+        finally:
+            numba.config.CACHE_DIR = previous
+
+    return apply
+
+
+# Flat float copies for the jitted kernels (numba freezes float globals as constants)
+A_FR1, B_FR1, C_FR1, D_FR1, CONST_FR1 = PARAMS_FR1
+A_FR3, B_FR3, C_FR3, D_FR3, E_FR3, F_FR3, CONST_FR3 = PARAMS_FR3
+
+# All fast-math flags except nnan/ninf: log(0) -> -inf -> exp(-inf) = 0 must
+# survive so a zero V_f or f_fu still yields the constant term, as x**b did.
+_FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+# Scalar (float) or NumPy array input; arrays broadcast against each other
+FloatOrArray = Union[float, np.ndarray]
+
+
+def _any_array(*xs) -> bool:
+    return any(isinstance(x, np.ndarray) for x in xs)
+
+
+def clamp_nonnegative(x: float) -> float:
+    return x if x > 0.0 else 0.0
+
+
+def clamp_nonnegative_array(a: np.ndarray) -> np.ndarray:
+    # In place: overwrites and returns a
+    return np.maximum(a, 0.0, out=a)
+
+
+# -----------------------------
+# Scalar kernels (nopython)
+# Power products are evaluated as a*exp(sum(b_i*log(x_i))) + const:
+# one exp plus n logs instead of n pow calls.
+# -----------------------------
+@_keyed_cache(njit(cache=True, fastmath=_FASTMATH))
+def _fr1_scalar(vf_dec: float, lambda_f: float, fc_mpa: float) -> float:
+    log_sum = B_FR1 * math.log(vf_dec) + C_FR1 * math.log(lambda_f) + D_FR1 * math.log(fc_mpa)
+    return A_FR1 * math.exp(log_sum) + CONST_FR1
+
+
+@_keyed_cache(njit(cache=True, fastmath=_FASTMATH))
+def _fr3_scalar(vf_dec: float, lambda_f: float, fc_mpa: float, ffu_mpa: float, lf_mm: float) -> float:
+    ffu_star = ffu_mpa / 1000.0
+    lf_star = lf_mm / 50.0
+    log_sum = (
+        B_FR3 * math.log(vf_dec)
+        + C_FR3 * math.log(lambda_f)
+        + D_FR3 * math.log(fc_mpa)
+        + E_FR3 * math.log(ffu_star)
+        + F_FR3 * math.log(lf_star)
+    )
+    return A_FR3 * math.exp(log_sum) + CONST_FR3
+
+
+# Prefer a compiled sfrc_kernels extension when present: either the numba
+# ahead-of-time build (see the __main__ block) or the Cython build from
+# setup.py. Both load without any JIT warm-up and fix the signatures at
+# build time; the numba build also bakes in the coefficients, whereas the
+# Cython one reads them from constants.py at import. A stale build (the AOT
+# build after constants.py is edited, or either with an older argument list)
+# is detected by checking it against the plain ** form of the model on a
+# probe input, and the JIT kernels are used instead.
+def _fr1_reference(vf_dec: float, lambda_f: float, fc_mpa: float) -> float:
+    p = PARAMS_FR1
+    return p.a * vf_dec ** p.b * lambda_f ** p.c * fc_mpa ** p.d + p.const
+
+
+def _fr3_reference(vf_dec: float, lambda_f: float, fc_mpa: float, ffu_mpa: float, lf_mm: float) -> float:
+    p = PARAMS_FR3
+    return (
+        p.a * vf_dec ** p.b * lambda_f ** p.c * fc_mpa ** p.d * (ffu_mpa / 1000.0) ** p.e * (lf_mm / 50.0) ** p.f
+        + p.const
+    )
+
+
+# Every factor differs from 1 so each coefficient affects the probe result
+_PROBE_FR1 = (0.01, 60.0, 40.0)
+_PROBE_FR3 = (0.01, 60.0, 40.0, 2500.0, 60.0)
+
+
+def _agrees(point, reference, args) -> bool:
+    try:
+        return math.isclose(point(*args), reference(*args), rel_tol=1e-9)
+    except TypeError:
+        return False
+
+
+try:
+    from sfrc_kernels import fr1 as _fr1_point, fr3 as _fr3_point
+except ImportError:
+    _fr1_point, _fr3_point = _fr1_scalar, _fr3_scalar
+else:
+    if not (_agrees(_fr1_point, _fr1_reference, _PROBE_FR1) and _agrees(_fr3_point, _fr3_reference, _PROBE_FR3)):
+        _fr1_point, _fr3_point = _fr1_scalar, _fr3_scalar
+
+
+# -----------------------------
+# Array kernels: threaded ufuncs over the scalar kernels (broadcast like NumPy)
+# Built on first array call rather than at import: compiling a parallel
+# ufunc on Streamlit's script thread leaves numba's workqueue threads
+# blocking interpreter exit, and the calculator only evaluates scalars.
+# The element functions get their own names so their on-disk cache entries
+# do not collide with the scalar kernels'.
+# -----------------------------
+def _fr1_elementwise(vf_dec, lambda_f, fc_mpa):
+    return _fr1_scalar(vf_dec, lambda_f, fc_mpa)
+
+
+def _fr3_elementwise(vf_dec, lambda_f, fc_mpa, ffu_mpa, lf_mm):
+    return _fr3_scalar(vf_dec, lambda_f, fc_mpa, ffu_mpa, lf_mm)
+
+
+@functools.lru_cache(maxsize=None)
+def _parallel_ufunc(func, n_args: int):
+    sig = float64(*([float64] * n_args))
+    return _keyed_cache(vectorize([sig], target="parallel", fastmath=_FASTMATH, cache=True))(func)
+
+
+# -----------------------------
+# Public predictors (scalar or broadcast arrays)
+# Plain floats (the calculator's only input) take an exact-type check
+# straight to the scalar kernel; other scalars (ints, NumPy scalars) are
+# converted first. The parallel ufunc's thread dispatch only pays off on arrays.
+# -----------------------------
+def fr1_pred(vf_dec: FloatOrArray, lambda_f: FloatOrArray, fc_mpa: FloatOrArray) -> FloatOrArray:
+    if type(vf_dec) is float and type(lambda_f) is float and type(fc_mpa) is float:
+        return _fr1_point(vf_dec, lambda_f, fc_mpa)
+    if _any_array(vf_dec, lambda_f, fc_mpa):
+        with np.errstate(divide="ignore"):
+            return _parallel_ufunc(_fr1_elementwise, 3)(vf_dec, lambda_f, fc_mpa)
+    return _fr1_point(float(vf_dec), float(lambda_f), float(fc_mpa))
+
+
+def fr3_pred(
+    vf_dec: FloatOrArray, lambda_f: FloatOrArray, fc_mpa: FloatOrArray, ffu_mpa: FloatOrArray, lf_mm: FloatOrArray
+) -> FloatOrArray:
+    if (
+        type(vf_dec) is float
+        and type(lambda_f) is float
+        and type(fc_mpa) is float
+        and type(ffu_mpa) is float
+        and type(lf_mm) is float
+    ):
+        return _fr3_point(vf_dec, lambda_f, fc_mpa, ffu_mpa, lf_mm)
+    if _any_array(vf_dec, lambda_f, fc_mpa, ffu_mpa, lf_mm):
+        with np.errstate(divide="ignore"):
+            return _parallel_ufunc(_fr3_elementwise, 5)(vf_dec, lambda_f, fc_mpa, ffu_mpa, lf_mm)
+    return _fr3_point(float(vf_dec), float(lambda_f), float(fc_mpa), float(ffu_mpa), float(lf_mm))
+
+
+# -----------------------------
+# Batch evaluation (Monte Carlo samples, parameter sweeps)
+# -----------------------------
+# Rows per strip: six float64 strips of this length (~0.8 MB) stay cache-resident
+BATCH_SIZE = 1 << 14
+
+# Single-precision coefficients for the float32 sweep path (3-4 significant
+# digits, so float32 is ample); keeps every operand float32.
+_PARAMS_FR1_F32 = np.array(PARAMS_FR1, dtype=np.float32)
+_PARAMS_FR3_F32 = np.array(PARAMS_FR3, dtype=np.float32)
+
+
+def _predict_strip_f32(vf, lambda_f, fc, ffu, lf, out1, out3) -> None:
+    # NumPy evaluation in float32; the logs of V_f, lambda_f and f_c are shared by fR1 and fR3
+    log_vf, log_lam, log_fc = np.log(vf), np.log(lambda_f), np.log(fc)
+    a, b, c, d, const = _PARAMS_FR1_F32
+    np.exp(b * log_vf + c * log_lam + d * log_fc, out=out1)
+    out1 *= a
+    out1 += const
+    a, b, c, d, e, f, const = _PARAMS_FR3_F32
+    log_sum = b * log_vf + c * log_lam + d * log_fc
+    log_sum += e * np.log(ffu / np.float32(1000.0))
+    log_sum += f * np.log(lf / np.float32(50.0))
+    np.exp(log_sum, out=out3)
+    out3 *= a
+    out3 += const
+
+
+def predict_batch(
+    vf_dec: FloatOrArray,
+    lf_mm: FloatOrArray,
+    df_mm: FloatOrArray,
+    fc_mpa: FloatOrArray,
+    ffu_mpa: FloatOrArray,
+    batch_size: int = BATCH_SIZE,
+    dtype: type = np.float64,
+) -> tuple[np.ndarray, np.ndarray]:
+    # Mean fR1 and fR3 (clamped to >= 0) for independent samples. Inputs are
+    # broadcast together; lambda_f is formed once per strip and shared.
+    # dtype=np.float32 halves memory traffic for large sweeps (sub-1% error
+    # vs float64); the calculator itself always evaluates in float64.
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError(f"dtype must be float32 or float64, got {dtype}")
+    arrays = np.broadcast_arrays(*(np.asarray(x, dtype=dtype) for x in (vf_dec, lf_mm, df_mm, fc_mpa, ffu_mpa)))
+    shape = arrays[0].shape
+    vf, lf, df, fc, ffu = (a.reshape(-1) for a in arrays)
+    fr1 = np.empty(vf.size, dtype=dtype)
+    fr3 = np.empty(vf.size, dtype=dtype)
+    if dtype == np.float64:
+        fr1_ufunc = _parallel_ufunc(_fr1_elementwise, 3)
+        fr3_ufunc = _parallel_ufunc(_fr3_elementwise, 5)
+    with np.errstate(divide="ignore"):
+        for start in range(0, vf.size, batch_size):
+            strip = slice(start, start + batch_size)
+            lambda_f = lf[strip] / df[strip]
+            if dtype == np.float64:
+                fr1_ufunc(vf[strip], lambda_f, fc[strip], out=fr1[strip])
+                fr3_ufunc(vf[strip], lambda_f, fc[strip], ffu[strip], lf[strip], out=fr3[strip])
+            else:
+                _predict_strip_f32(vf[strip], lambda_f, fc[strip], ffu[strip], lf[strip], fr1[strip], fr3[strip])
+    return clamp_nonnegative_array(fr1).reshape(shape), clamp_nonnegative_array(fr3).reshape(shape)
+
+
+# Column names expected by df_to_soa (and keyword names of predict_soa)
+SOA_COLUMNS = ("vf_dec", "lf_mm", "df_mm", "fc_mpa", "ffu_mpa")
+
+
+def df_to_soa(frame: "pd.DataFrame") -> dict[str, np.ndarray]:
+    # One contiguous float64 array per variable (structure of arrays)
+    return {c: np.ascontiguousarray(frame[c].to_numpy(dtype=np.float64)) for c in SOA_COLUMNS}
+
+
+def predict_soa(
+    vf_dec: np.ndarray,
+    lf_mm: np.ndarray,
+    df_mm: np.ndarray,
+    fc_mpa: np.ndarray,
+    ffu_mpa: np.ndarray,
+    dtype: type = np.float64,
+) -> tuple[np.ndarray, np.ndarray]:
+    # e.g. frame["fR1"], frame["fR3"] = predict_soa(**df_to_soa(frame)); avoids DataFrame.apply(axis=1)
+    arrays = (np.ascontiguousarray(x, dtype=dtype) for x in (vf_dec, lf_mm, df_mm, fc_mpa, ffu_mpa))
+    return predict_batch(*arrays, dtype=dtype)
+
+
+# -----------------------------
+# Batch validation (validity ranges as boolean masks)
+# -----------------------------
+# Column order of the validate_batch mask
+BATCH_CONSTRAINTS = ("vf_dec", "fc", "lambda_f", "ffu")
+
+
+def validate_batch(
+    vf_dec: FloatOrArray, lf_mm: FloatOrArray, df_mm: FloatOrArray, fc_mpa: FloatOrArray, ffu_mpa: FloatOrArray
+) -> np.ndarray:
+    # True where the input lies inside the calibration range; shape is the
+    # broadcast input shape plus one trailing axis per BATCH_CONSTRAINTS entry.
+    # Rows with any violation: ~np.logical_and.reduce(mask, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lambda_f = np.divide(lf_mm, df_mm)
+    limits = (
+        (np.asarray(vf_dec), VF_DEC_MIN, VF_DEC_MAX),
+        (np.asarray(fc_mpa), FC_MIN, FC_MAX),
+        (lambda_f, LAMBDA_MIN, LAMBDA_MAX),
+        (np.asarray(ffu_mpa), FFU_MIN, FFU_MAX),
+    )
+    checks = [(x >= lo) & (x <= hi) for x, lo, hi in limits]
+    return np.stack(np.broadcast_arrays(*checks), axis=-1)
+
+
+# Warm-up at import so the first Compute click does not pay the JIT cost
+fr1_pred(0.01, 50.0 / 0.75, 40.0)
+fr3_pred(0.01, 50.0 / 0.75, 40.0, 2000.0, 50.0)
+
+
+if __name__ == "__main__":
+    # Ahead-of-time build: `python kernels.py` writes the sfrc_kernels
+    # extension module next to this file.
+    from numba.pycc import CC
+
+    cc = CC("sfrc_kernels")
+    cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+    cc.export("fr1", "f8(f8, f8, f8)")(_fr1_scalar.py_func)
+    cc.export("fr3", "f8(f8, f8, f8, f8, f8)")(_fr3_scalar.py_func)
+    cc.compile()
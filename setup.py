@@ -0,0 +1,18 @@
+# Optional Cython build of the scalar kernels (needs Cython and a C compiler):
+#     python setup.py build_ext --inplace
+from Cython.Build import cythonize
+from setuptools import Extension, setup
+
+# -fno-finite-math-only keeps log(0) = -inf, so a zero V_f or f_fu still
+# reduces to the constant term (see _FASTMATH in kernels.py)
+extension = Extension(
+    "sfrc_kernels",
+    ["sfrc_kernels.pyx"],
+    extra_compile_args=["-O3", "-ffast-math", "-fno-finite-math-only", "-march=native"],
+    libraries=["m"],
+)
+
+setup(
+    name="sfrc-kernels",
+    ext_modules=cythonize([extension], language_level=3),
+)
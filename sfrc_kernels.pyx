@@ -0,0 +1,36 @@
+# cython: boundscheck=False, wraparound=False, cdivision=True
+# Cython build of the scalar fR1/fR3 kernels; same exports as the numba
+# ahead-of-time build (`python kernels.py`), so kernels.py picks up either.
+from libc.math cimport exp, log
+
+from constants import PARAMS_FR1, PARAMS_FR3
+
+cdef double A_FR1 = PARAMS_FR1.a
+cdef double B_FR1 = PARAMS_FR1.b
+cdef double C_FR1 = PARAMS_FR1.c
+cdef double D_FR1 = PARAMS_FR1.d
+cdef double CONST_FR1 = PARAMS_FR1.const
+
+cdef double A_FR3 = PARAMS_FR3.a
+cdef double B_FR3 = PARAMS_FR3.b
+cdef double C_FR3 = PARAMS_FR3.c
+cdef double D_FR3 = PARAMS_FR3.d
+cdef double E_FR3 = PARAMS_FR3.e
+cdef double F_FR3 = PARAMS_FR3.f
+cdef double CONST_FR3 = PARAMS_FR3.const
+
+
+cpdef double fr1(double vf_dec, double lambda_f, double fc_mpa) noexcept nogil:
+    cdef double log_sum = B_FR1 * log(vf_dec) + C_FR1 * log(lambda_f) + D_FR1 * log(fc_mpa)
+    return A_FR1 * exp(log_sum) + CONST_FR1
+
+
+cpdef double fr3(double vf_dec, double lambda_f, double fc_mpa, double ffu_mpa, double lf_mm) noexcept nogil:
+    cdef double log_sum = (
+        B_FR3 * log(vf_dec)
+        + C_FR3 * log(lambda_f)
+        + D_FR3 * log(fc_mpa)
+        + E_FR3 * log(ffu_mpa / 1000.0)
+        + F_FR3 * log(lf_mm / 50.0)
+    )
+    return A_FR3 * exp(log_sum) + CONST_FR3
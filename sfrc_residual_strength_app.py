@@ -1,67 +1,107 @@
 import streamlit as st
 
+from constants import (
+    FC_FROM_FCU,
+    FC_MAX,
+    FC_MIN,
+    FFU_MAX,
+    FFU_MIN,
+    FIBRE_TYPE_NOTE,
+    LAMBDA_MAX,
+    LAMBDA_MIN,
+    SCALE,
+    VF_DEC_MAX,
+    VF_DEC_MIN,
+    VF_PCT_MAX,
+    VF_PCT_MIN,
+)
+from kernels import clamp_nonnegative, fr1_pred, fr3_pred
+
 st.set_page_config(
     page_title="SFRC Residual Flexural Strength Tool (fR1, fR3)",
     page_icon="🧱",
     layout="wide",
 )
 
-# -----------------------------
-# Fixed model parameters (as provided)
-# -----------------------------
-PARAMS_FR1 = dict(a=6.939, b=0.448, c=0.377, d=0.265, const=-3.823)
-PARAMS_FR3 = dict(a=12.000, b=0.613, c=0.370, d=0.247, e=0.411, f=0.313, const=-1.506)
 
-# Reliability-based scaling (EN 1990 Annex C calibration; Code 2)
-SCALE = {
-    "fR1": {"k_char": 0.67, "k_design": 0.49, "gamma": 1.36},
-    "fR3": {"k_char": 0.62, "k_design": 0.43, "gamma": 1.45},
-}
+def in_range(x: float, lo: float, hi: float) -> bool:
+    return (x >= lo) and (x <= hi)
+
+
+# Cached per input tuple: reruns with unchanged inputs skip the predictor
+@st.cache_data(max_entries=128)
+def compute_fr1(vf_dec: float, lam: float, fc: float) -> tuple[float, float, float, float]:
+    raw = fr1_pred(vf_dec, lam, fc)
+    pred = clamp_nonnegative(raw)
+    return raw, pred, SCALE["fR1"]["k_char"] * pred, SCALE["fR1"]["k_design"] * pred
+
+
+@st.cache_data(max_entries=128)
+def compute_fr3(vf_dec: float, lam: float, fc: float, ffu: float, lf: float) -> tuple[float, float, float, float]:
+    raw = fr3_pred(vf_dec, lam, fc, ffu, lf)
+    pred = clamp_nonnegative(raw)
+    return raw, pred, SCALE["fR3"]["k_char"] * pred, SCALE["fR3"]["k_design"] * pred
+
 
 # -----------------------------
-# Fixed validity limits (dataset-based) - NOT editable
+# Method & equations page (static content)
 # -----------------------------
-FC_MIN, FC_MAX = 22.0, 79.0          # MPa (matrix strength)
-VF_PCT_MIN, VF_PCT_MAX = 0.2, 2.0    # percent
-VF_DEC_MIN, VF_DEC_MAX = 0.002, 0.02 # decimal
-LAMBDA_MIN, LAMBDA_MAX = 38.0, 100.0 # lf/df
-FFU_MIN, FFU_MAX = 1000.0, 3200.0   # MPa
-
-# Fibre type note (must match dataset used for calibration)
-FIBRE_TYPE_NOTE = (
-    "3D Hooked-end steel fibres (as in the experimental dataset used for model development/calibration)."
-)
+_METHOD_INPUTS_MD = r"""
+- $V_f$ can be entered as **percent** or **decimal**.
+- Concrete strength can be entered as $f_c$ or $f_{cu}$. The tool uses the rough conversion:
 
-# fc - fcu conversion (rough)
-FC_FROM_FCU = 0.82
+\[ f_c = 0.82\, f_{cu} \]
+"""
 
+_METHOD_LIMITS_MD = r"""
+**Model validity ranges (dataset-based):**
+- $f_c$: **22 to 79 MPa**
+- $V_f$: **0.2% to 2.0%**
+- $\lambda_f=l_f/d_f$: **38 to 100**
+- $f_{fu}$: **1000 to 3200 MPa** (only for $f_{R,3}$)
+
+**Fibre type considered:**
+- 3D Hooked-end steel fibres (as in the experimental dataset used for model development/calibration).
 
-def clamp_nonnegative(x: float) -> float:
-    return max(0.0, x)
+**Use limitation:**
+- This application is provided **for scientific/research use only** and is **not intended for structural design**.
+"""
 
 
-def fr1_pred(vf_dec: float, lf_mm: float, df_mm: float, fc_mpa: float) -> float:
-    p = PARAMS_FR1
-    return p["a"] * (vf_dec ** p["b"]) * ((lf_mm / df_mm) ** p["c"]) * (fc_mpa ** p["d"]) + p["const"]
+def render_method_page() -> None:
+    st.title("Method & equations")
 
+    st.subheader("Mean prediction models")
+
+    st.markdown(r"### $f_{R,1}$")
+    st.latex(r"f_{R,1m}^{\mathrm{pred}} = 6.939\, V_f^{0.448}\, \left(\frac{l_f}{d_f}\right)^{0.377}\, f_c^{0.265} - 3.823")
 
-def fr3_pred(vf_dec: float, lf_mm: float, df_mm: float, fc_mpa: float, ffu_mpa: float) -> float:
-    p = PARAMS_FR3
-    ffu_star = ffu_mpa / 1000.0
-    lf_star = lf_mm / 50.0
-    return (
-        p["a"]
-        * (vf_dec ** p["b"])
-        * ((lf_mm / df_mm) ** p["c"])
-        * (fc_mpa ** p["d"])
-        * (ffu_star ** p["e"])
-        * (lf_star ** p["f"])
-        + p["const"]
+    st.markdown(r"### $f_{R,3}$")
+    st.latex(r"f_{fu}^* = \frac{f_{fu}}{1000}\qquad l_f^* = \frac{l_f}{50}")
+    st.latex(
+        r"f_{R,3m}^{\mathrm{pred}} = 12.000\, V_f^{0.613}\, \left(\frac{l_f}{d_f}\right)^{0.370}\, f_c^{0.247}\, (f_{fu}^*)^{0.411}\, (l_f^*)^{0.313} - 1.506"
     )
 
+    st.subheader("Characteristic and design values")
 
-def in_range(x: float, lo: float, hi: float) -> bool:
-    return (x >= lo) and (x <= hi)
+    st.markdown(r"### $f_{R,1}$")
+    st.latex(r"f_{R,1k} = 0.67\, f_{R,1m}^{\mathrm{pred}}\qquad f_{R,1d} = 0.49\, f_{R,1m}^{\mathrm{pred}}")
+    st.latex(r"\gamma_{fR,1} = 1.36")
+
+    st.markdown(r"### $f_{R,3}$")
+    st.latex(r"f_{R,3k} = 0.62\, f_{R,3m}^{\mathrm{pred}}\qquad f_{R,3d} = 0.43\, f_{R,3m}^{\mathrm{pred}}")
+    st.latex(r"\gamma_{fR,3} = 1.45")
+
+    st.subheader("Input formats")
+    st.markdown(_METHOD_INPUTS_MD)
+
+    st.subheader("Validated limits and fibre type")
+    st.markdown(_METHOD_LIMITS_MD)
+
+    st.subheader("Numerical safeguard")
+    st.markdown(
+        r"If a raw mean prediction becomes negative due to the constant term, the tool sets it to **0.0 MPa**."
+    )
 
 
 # -----------------------------
@@ -136,97 +176,106 @@ if page == "🧮 Calculator":
     left, right = st.columns([1.05, 0.95], gap="large")
 
     with left:
-        st.subheader("Inputs")
+        with st.form("inputs"):
+            st.subheader("Inputs")
 
-        c_t1, c_t2 = st.columns(2)
-        with c_t1:
-            calc_fr1 = st.checkbox(r"Compute $f_{R,1}$", value=True)
-        with c_t2:
-            calc_fr3 = st.checkbox(r"Compute $f_{R,3}$", value=True)
+            c_t1, c_t2 = st.columns(2)
+            with c_t1:
+                calc_fr1 = st.checkbox(r"Compute $f_{R,1}$", value=True)
+            with c_t2:
+                calc_fr3 = st.checkbox(r"Compute $f_{R,3}$", value=True)
 
-        c1, c2 = st.columns(2)
+            c1, c2 = st.columns(2)
 
-        with c1:
-            if vf_mode == "Percent (%)":
-                vf_in = st.number_input(r"$V_f$ (%)", min_value=0.0, value=1.0, step=0.05, format="%.3f")
-                vf_dec = vf_in / 100.0
-            else:
-                vf_in = st.number_input(r"$V_f$ (decimal)", min_value=0.0, value=0.01, step=0.0005, format="%.6f")
-                vf_dec = vf_in
+            with c1:
+                if vf_mode == "Percent (%)":
+                    vf_in = st.number_input(r"$V_f$ (%)", min_value=0.0, value=1.0, step=0.05, format="%.3f")
+                    vf_dec = vf_in / 100.0
+                else:
+                    vf_in = st.number_input(r"$V_f$ (decimal)", min_value=0.0, value=0.01, step=0.0005, format="%.6f")
+                    vf_dec = vf_in
 
-            lf = st.number_input(r"$l_f$ (mm)", min_value=0.1, value=50.0, step=1.0)
-            df = st.number_input(r"$d_f$ (mm)", min_value=0.01, value=0.75, step=0.01, format="%.2f")
+                lf = st.number_input(r"$l_f$ (mm)", min_value=0.1, value=50.0, step=1.0)
+                df = st.number_input(r"$d_f$ (mm)", min_value=0.01, value=0.75, step=0.01, format="%.2f")
 
-        with c2:
-            if strength_mode == "fc":
-                fc = st.number_input(r"$f_c$ (MPa)", min_value=0.1, value=40.0, step=1.0)
-                fcu = None
-            else:
-                fcu = st.number_input(r"$f_{cu}$ (MPa)", min_value=0.1, value=50.0, step=1.0)
-                fc = FC_FROM_FCU * fcu
-                st.caption(rf"Converted: $f_c = 0.82\,f_{{cu}} = {fc:.2f}\,\mathrm{{MPa}}$")
+            with c2:
+                if strength_mode == "fc":
+                    fc = st.number_input(r"$f_c$ (MPa)", min_value=0.1, value=40.0, step=1.0)
+                    fcu = None
+                else:
+                    fcu = st.number_input(r"$f_{cu}$ (MPa)", min_value=0.1, value=50.0, step=1.0)
+                    fc = FC_FROM_FCU * fcu
+                    st.caption(rf"Converted: $f_c = 0.82\,f_{{cu}} = {fc:.2f}\,\mathrm{{MPa}}$")
 
-            ffu = st.number_input(r"$f_{fu}$ (MPa) — only for $f_{R,3}$", min_value=0.0, value=2000.0, step=10.0)
+                ffu = st.number_input(r"$f_{fu}$ (MPa) — only for $f_{R,3}$", min_value=0.0, value=2000.0, step=10.0)
+
+            submitted = st.form_submit_button("Compute", type="primary")
 
         st.markdown("---")
         st.subheader("Validation")
 
-        warnings = []
-
-        # Positivity
-        if vf_dec <= 0 or lf <= 0 or df <= 0 or fc <= 0:
-            warnings.append("Inputs $V_f$, $l_f$, $d_f$, and $f_c$ must be positive.")
-
-        # Vf
-        if vf_mode == "Percent (%)":
-            if not in_range(vf_in, VF_PCT_MIN, VF_PCT_MAX):
-                warnings.append(rf"$V_f$ = {vf_in:.3f}% is outside [{VF_PCT_MIN}, {VF_PCT_MAX}]%.")
-        else:
-            if not in_range(vf_in, VF_DEC_MIN, VF_DEC_MAX):
-                warnings.append(rf"$V_f$ = {vf_in:.6f} is outside [{VF_DEC_MIN}, {VF_DEC_MAX}].")
-
-        # fc
-        if not in_range(fc, FC_MIN, FC_MAX):
-            warnings.append(rf"$f_c$ = {fc:.2f} MPa is outside [{FC_MIN}, {FC_MAX}] MPa.")
-
-        # lambda
         lam = lf / df if df > 0 else float("nan")
-        if df > 0 and not in_range(lam, LAMBDA_MIN, LAMBDA_MAX):
-            warnings.append(rf"$\lambda_f = l_f/d_f$ = {lam:.2f} is outside [{LAMBDA_MIN}, {LAMBDA_MAX}].")
-
-        # ffu
-        if calc_fr3:
-            if not in_range(ffu, FFU_MIN, FFU_MAX):
-                warnings.append(rf"$f_{{fu}}$ = {ffu:.0f} MPa is outside [{FFU_MIN}, {FFU_MAX}] MPa.")
 
-        if warnings:
-            for w in warnings:
-                st.warning(w)
+        # Validation is keyed on the submitted inputs: reruns that leave them
+        # unchanged (e.g. toggling "Allow extrapolation") reuse the stored
+        # warnings, and the results below come back from the compute_* cache.
+        # Switching pages resets the form to its defaults, which need a new
+        # Compute click.
+        input_key = (vf_mode, strength_mode, calc_fr3, vf_in, lf, df, fc, ffu)
+        if submitted and st.session_state.get("validated_key") != input_key:
+            warnings = []
+
+            # Positivity
+            if vf_dec <= 0 or lf <= 0 or df <= 0 or fc <= 0:
+                warnings.append("Inputs $V_f$, $l_f$, $d_f$, and $f_c$ must be positive.")
+
+            # Range checks as (label, value, lo, hi, value format, unit); None = not applicable
+            limits = (
+                (r"$V_f$", vf_in, VF_PCT_MIN, VF_PCT_MAX, ".3f", "%")
+                if vf_mode == "Percent (%)"
+                else (r"$V_f$", vf_in, VF_DEC_MIN, VF_DEC_MAX, ".6f", ""),
+                (r"$f_c$", fc, FC_MIN, FC_MAX, ".2f", " MPa"),
+                (r"$\lambda_f = l_f/d_f$", lam, LAMBDA_MIN, LAMBDA_MAX, ".2f", "") if df > 0 else None,
+                (r"$f_{fu}$", ffu, FFU_MIN, FFU_MAX, ".0f", " MPa") if calc_fr3 else None,
+            )
+            violations = [c for c in limits if c is not None and not in_range(c[1], c[2], c[3])]
+
+            # Messages are only formatted for the (uncommon) failing checks
+            for label, x, lo, hi, fmt, unit in violations:
+                warnings.append(rf"{label} = {x:{fmt}}{unit} is outside [{lo}, {hi}]{unit}.")
+
+            st.session_state["validated_key"] = input_key
+            st.session_state["validated_warnings"] = warnings
+
+        validated = st.session_state.get("validated_key") == input_key
+        can_compute = False
+        if not validated:
+            st.info("Inputs are checked against the validated limits when you click Compute.")
         else:
-            st.success("All inputs are within the validated limits.")
+            warnings = st.session_state["validated_warnings"]
 
-        can_compute = True
-        if (not allow_extrap) and warnings:
-            can_compute = False
-            st.error("Computation stopped (extrapolation is not allowed).")
+            if warnings:
+                for w in warnings:
+                    st.warning(w)
+            else:
+                st.success("All inputs are within the validated limits.")
 
-        compute_btn = st.button("Compute", type="primary", disabled=(not can_compute))
+            can_compute = True
+            if (not allow_extrap) and warnings:
+                can_compute = False
+                st.error("Computation stopped (extrapolation is not allowed).")
 
     with right:
         st.subheader("Results")
 
         if not (calc_fr1 or calc_fr3):
             st.info("Select at least one target.")
-        elif compute_btn:
-            lf_df = lf / df
+        elif can_compute:
             ffu_star = ffu / 1000.0
             lf_star = lf / 50.0
 
             if calc_fr1:
-                pred1_raw = fr1_pred(vf_dec, lf, df, fc)
-                pred1 = clamp_nonnegative(pred1_raw)
-                f1k = SCALE["fR1"]["k_char"] * pred1
-                f1d = SCALE["fR1"]["k_design"] * pred1
+                pred1_raw, pred1, f1k, f1d = compute_fr1(vf_dec, lam, fc)
 
                 with st.container(border=True):
                     st.markdown(r"## $f_{R,1}$")
@@ -243,16 +292,13 @@ if page == "🧮 Calculator":
                         st.latex(r"f_{R,1}^{\mathrm{pred}} = 6.939\, V_f^{0.448}\, (l_f/d_f)^{0.377}\, f_c^{0.265} - 3.823")
                         st.markdown(
                             rf"- $V_f$ (decimal) = **{vf_dec:.6f}**\n"
-                            rf"- $\lambda_f=l_f/d_f$ = **{lf_df:.2f}**\n"
+                            rf"- $\lambda_f=l_f/d_f$ = **{lam:.2f}**\n"
                             rf"- $f_c$ = **{fc:.2f} MPa**\n"
                             rf"- $f_{{R,1}}^{{\mathrm{{pred}}}}$ (raw) = **{pred1_raw:.3f} MPa**"
                         )
 
             if calc_fr3:
-                pred3_raw = fr3_pred(vf_dec, lf, df, fc, ffu)
-                pred3 = clamp_nonnegative(pred3_raw)
-                f3k = SCALE["fR3"]["k_char"] * pred3
-                f3d = SCALE["fR3"]["k_design"] * pred3
+                pred3_raw, pred3, f3k, f3d = compute_fr3(vf_dec, lam, fc, ffu, lf)
 
                 with st.container(border=True):
                     st.markdown(r"## $f_{R,3}$")
@@ -270,13 +316,15 @@ if page == "🧮 Calculator":
                         st.latex(r"f_{R,3}^{\mathrm{pred}} = 12.000\, V_f^{0.613}\, (l_f/d_f)^{0.370}\, f_c^{0.247}\, (f_{fu}^*)^{0.411}\, (l_f^*)^{0.313} - 1.506")
                         st.markdown(
                             rf"- $V_f$ (decimal) = **{vf_dec:.6f}**\n"
-                            rf"- $\lambda_f=l_f/d_f$ = **{lf_df:.2f}**\n"
+                            rf"- $\lambda_f=l_f/d_f$ = **{lam:.2f}**\n"
                             rf"- $f_c$ = **{fc:.2f} MPa**\n"
                             rf"- $f_{{fu}}^*$ = **{ffu_star:.3f}**\n"
                             rf"- $l_f^*$ = **{lf_star:.3f}**\n"
                             rf"- $f_{{R,3}}^{{\mathrm{{pred}}}}$ (raw) = **{pred3_raw:.3f} MPa**"
                         )
 
+        elif validated:
+            st.error("Not computed: inputs are outside the validated limits and extrapolation is not allowed.")
         else:
             st.info("Enter inputs and click Compute.")
 
@@ -285,57 +333,4 @@ if page == "🧮 Calculator":
 # Page: Method & equations
 # -----------------------------
 else:
-    st.title("Method & equations")
-
-    st.subheader("Mean prediction models")
-
-    st.markdown(r"### $f_{R,1}$")
-    st.latex(r"f_{R,1m}^{\mathrm{pred}} = 6.939\, V_f^{0.448}\, \left(\frac{l_f}{d_f}\right)^{0.377}\, f_c^{0.265} - 3.823")
-
-    st.markdown(r"### $f_{R,3}$")
-    st.latex(r"f_{fu}^* = \frac{f_{fu}}{1000}\qquad l_f^* = \frac{l_f}{50}")
-    st.latex(
-        r"f_{R,3m}^{\mathrm{pred}} = 12.000\, V_f^{0.613}\, \left(\frac{l_f}{d_f}\right)^{0.370}\, f_c^{0.247}\, (f_{fu}^*)^{0.411}\, (l_f^*)^{0.313} - 1.506"
-    )
-
-    st.subheader("Characteristic and design values")
-
-    st.markdown(r"### $f_{R,1}$")
-    st.latex(r"f_{R,1k} = 0.67\, f_{R,1m}^{\mathrm{pred}}\qquad f_{R,1d} = 0.49\, f_{R,1m}^{\mathrm{pred}}")
-    st.latex(r"\gamma_{fR,1} = 1.36")
-
-    st.markdown(r"### $f_{R,3}$")
-    st.latex(r"f_{R,3k} = 0.62\, f_{R,3m}^{\mathrm{pred}}\qquad f_{R,3d} = 0.43\, f_{R,3m}^{\mathrm{pred}}")
-    st.latex(r"\gamma_{fR,3} = 1.45")
-
-    st.subheader("Input formats")
-    st.markdown(
-        r"""
-- $V_f$ can be entered as **percent** or **decimal**.
-- Concrete strength can be entered as $f_c$ or $f_{cu}$. The tool uses the rough conversion:
-
-\[ f_c = 0.82\, f_{cu} \]
-        """
-    )
-
-    st.subheader("Validated limits and fibre type")
-    st.markdown(
-        r"""
-**Model validity ranges (dataset-based):**
-- $f_c$: **22 to 79 MPa**
-- $V_f$: **0.2% to 2.0%**
-- $\lambda_f=l_f/d_f$: **38 to 100**
-- $f_{fu}$: **1000 to 3200 MPa** (only for $f_{R,3}$)
-
-**Fibre type considered:**
-- 3D Hooked-end steel fibres (as in the experimental dataset used for model development/calibration).
-
-**Use limitation:**
-- This application is provided **for scientific/research use only** and is **not intended for structural design**.
-        """
-    )
-
-    st.subheader("Numerical safeguard")
-    st.markdown(
-        r"If a raw mean prediction becomes negative due to the constant term, the tool sets it to **0.0 MPa**."
-    )
+    render_method_page()
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sfrc_residual_strength_app.py")
+
+
+def submit(vf_mode="Percent (%)", **inputs):
+    # Number inputs in form order: vf, lf, df, fc, ffu
+    at = AppTest.from_file(APP, default_timeout=60).run()
+    at.sidebar.radio[1].set_value(vf_mode).run()
+    for i, name in enumerate(("vf", "lf", "df", "fc", "ffu")):
+        if name in inputs:
+            at.number_input[i].set_value(inputs[name])
+    at.button[0].click().run()
+    assert not at.exception
+    return at
+
+
+def range_warnings(at):
+    # Skips the research-use disclaimer shown above the calculator
+    return [w.value for w in at.main.warning if " is outside " in w.value]
+
+
+def test_default_inputs_are_within_limits():
+    at = submit()
+    assert not range_warnings(at)
+    assert [s.value for s in at.success] == ["All inputs are within the validated limits."]
+
+
+def test_range_warnings_match_baseline_text():
+    at = submit(vf=3.0, lf=50.0, df=0.2, fc=100.0, ffu=500.0)
+    assert range_warnings(at) == [
+        "$V_f$ = 3.000% is outside [0.2, 2.0]%.",
+        "$f_c$ = 100.00 MPa is outside [22.0, 79.0] MPa.",
+        r"$\lambda_f = l_f/d_f$ = 250.00 is outside [38.0, 100.0].",
+        "$f_{fu}$ = 500 MPa is outside [1000.0, 3200.0] MPa.",
+    ]
+
+
+def test_decimal_fibre_content_warning_matches_baseline_text():
+    at = submit(vf_mode="Decimal", vf=0.03)
+    assert range_warnings(at) == ["$V_f$ = 0.030000 is outside [0.002, 0.02]."]
+
+
+def test_blocked_submission_is_reported_in_results():
+    at = submit(fc=100.0)
+    assert at.metric
+    at.sidebar.checkbox[0].uncheck().run()
+    assert not at.metric
+    assert [e.value for e in at.main.error] == [
+        "Computation stopped (extrapolation is not allowed).",
+        "Not computed: inputs are outside the validated limits and extrapolation is not allowed.",
+    ]
+    assert "Enter inputs and click Compute." not in [i.value for i in at.main.info]
+
+
+def test_input_hint_is_shown_only_before_submission():
+    at = AppTest.from_file(APP, default_timeout=60).run()
+    assert "Enter inputs and click Compute." in [i.value for i in at.main.info]
+    at.button[0].click().run()
+    assert "Enter inputs and click Compute." not in [i.value for i in at.main.info]
+
+
+def test_reenabling_extrapolation_reuses_the_submission():
+    at = submit(fc=100.0)
+    extrapolated = [m.value for m in at.metric]
+    at.sidebar.checkbox[0].uncheck().run()
+    assert not at.metric
+    # No new Compute click: the stored validation still matches the form
+    at.sidebar.checkbox[0].check().run()
+    assert [m.value for m in at.metric] == extrapolated
@@ -0,0 +1,192 @@
+import os
+
+import numpy as np
+import pytest
+
+import kernels
+from constants import FC_MAX, FFU_MIN, LAMBDA_MAX, PARAMS_FR1, PARAMS_FR3, VF_DEC_MIN
+
+
+# Original (baseline) form of the models: a * x**b * ... + const
+def fr1_baseline(vf_dec, lf_mm, df_mm, fc_mpa):
+    p = PARAMS_FR1
+    return p.a * (vf_dec ** p.b) * ((lf_mm / df_mm) ** p.c) * (fc_mpa ** p.d) + p.const
+
+
+def fr3_baseline(vf_dec, lf_mm, df_mm, fc_mpa, ffu_mpa):
+    p = PARAMS_FR3
+    return (
+        p.a
+        * (vf_dec ** p.b)
+        * ((lf_mm / df_mm) ** p.c)
+        * (fc_mpa ** p.d)
+        * ((ffu_mpa / 1000.0) ** p.e)
+        * ((lf_mm / 50.0) ** p.f)
+        + p.const
+    )
+
+
+# Spans the validity ranges plus some extrapolated points
+CASES = [
+    (0.01, 50.0, 0.75, 40.0, 2000.0),
+    (0.002, 38.0, 1.0, 22.0, 1000.0),
+    (0.02, 60.0, 0.6, 79.0, 3200.0),
+    (0.005, 35.0, 0.55, 30.0, 1100.0),
+    (0.03, 13.0, 0.2, 90.0, 2500.0),
+]
+
+
+def sample_arrays(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    return (
+        rng.uniform(0.002, 0.02, n),
+        rng.uniform(30.0, 60.0, n),
+        rng.uniform(0.5, 1.0, n),
+        rng.uniform(22.0, 79.0, n),
+        rng.uniform(1000.0, 3200.0, n),
+    )
+
+
+@pytest.mark.parametrize("vf, lf, df, fc, ffu", CASES)
+def test_scalar_predictors_match_baseline(vf, lf, df, fc, ffu):
+    assert kernels.fr1_pred(vf, lf / df, fc) == pytest.approx(fr1_baseline(vf, lf, df, fc), rel=1e-12)
+    assert kernels.fr3_pred(vf, lf / df, fc, ffu, lf) == pytest.approx(fr3_baseline(vf, lf, df, fc, ffu), rel=1e-12)
+
+
+def test_scalar_predictors_accept_ints_and_numpy_scalars():
+    expected = fr1_baseline(0.01, 50.0, 1.0, 40.0)
+    assert kernels.fr1_pred(np.float64(0.01), 50, 40) == pytest.approx(expected, rel=1e-12)
+    assert kernels.fr3_pred(0.01, np.float32(50.0), 40, 2000, 50) == pytest.approx(
+        fr3_baseline(0.01, 50.0, 1.0, 40.0, 2000.0), rel=1e-12
+    )
+
+
+def test_array_predictors_match_baseline_and_broadcast():
+    vf, lf, df, fc, ffu = sample_arrays()
+    np.testing.assert_allclose(kernels.fr1_pred(vf, lf / df, fc), fr1_baseline(vf, lf, df, fc), rtol=1e-12)
+    np.testing.assert_allclose(
+        kernels.fr3_pred(vf, lf / df, fc, ffu, lf), fr3_baseline(vf, lf, df, fc, ffu), rtol=1e-12
+    )
+
+    vf_col = np.array([0.005, 0.01, 0.02])[:, None]
+    fc_row = np.array([[30.0, 40.0, 50.0, 60.0]])
+    grid = kernels.fr1_pred(vf_col, 50.0 / 0.75, fc_row)
+    assert grid.shape == (3, 4)
+    np.testing.assert_allclose(grid, fr1_baseline(vf_col, 50.0, 0.75, fc_row), rtol=1e-12)
+
+
+def test_zero_inputs_reduce_to_constant_term():
+    # x**b == 0 for x == 0, so the models reduce to their constant terms
+    assert kernels.fr1_pred(0.0, 50.0 / 0.75, 40.0) == PARAMS_FR1.const
+    assert kernels.fr3_pred(0.0, 50.0 / 0.75, 40.0, 2000.0, 50.0) == PARAMS_FR3.const
+    assert kernels.fr3_pred(0.01, 50.0 / 0.75, 40.0, 0.0, 50.0) == PARAMS_FR3.const
+
+    vf = np.array([0.0, 0.01])
+    ffu = np.array([2000.0, 0.0])
+    np.testing.assert_array_equal(kernels.fr1_pred(vf, 50.0 / 0.75, 40.0)[:1], [PARAMS_FR1.const])
+    np.testing.assert_array_equal(kernels.fr3_pred(vf, 50.0 / 0.75, 40.0, ffu, 50.0), [PARAMS_FR3.const] * 2)
+
+
+def test_stale_compiled_kernels_are_rejected():
+    assert kernels._agrees(kernels._fr1_scalar, kernels._fr1_reference, kernels._PROBE_FR1)
+    assert kernels._agrees(kernels._fr3_scalar, kernels._fr3_reference, kernels._PROBE_FR3)
+    # Wrong coefficients or an outdated argument list fall back to the JIT kernels
+    assert not kernels._agrees(lambda *args: 7.591, kernels._fr1_reference, kernels._PROBE_FR1)
+    assert not kernels._agrees(lambda vf, lf, df, fc: 0.0, kernels._fr1_reference, kernels._PROBE_FR1)
+
+
+@pytest.mark.parametrize("dtype, rtol", [(np.float64, 1e-12), (np.float32, 1e-4)])
+def test_predict_batch_matches_clamped_baseline(dtype, rtol):
+    # Spans several strips, with a partial one at the end
+    vf, lf, df, fc, ffu = sample_arrays(n=3 * kernels.BATCH_SIZE + 7)
+    fr1, fr3 = kernels.predict_batch(vf, lf, df, fc, ffu, dtype=dtype)
+    assert fr1.dtype == dtype and fr3.dtype == dtype
+    np.testing.assert_allclose(fr1, np.maximum(fr1_baseline(vf, lf, df, fc), 0.0), rtol=rtol)
+    np.testing.assert_allclose(fr3, np.maximum(fr3_baseline(vf, lf, df, fc, ffu), 0.0), rtol=rtol)
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_predict_batch_clamps_zero_inputs(dtype):
+    vf = np.array([0.0, 0.01])
+    ffu = np.array([2000.0, 0.0])
+    fr1, fr3 = kernels.predict_batch(vf, 50.0, 0.75, 40.0, ffu, dtype=dtype)
+    assert fr1[0] == 0.0
+    np.testing.assert_array_equal(fr3, [0.0, 0.0])
+
+
+def test_predict_batch_broadcasts_inputs():
+    vf = np.linspace(0.002, 0.02, 6).reshape(2, 3)
+    fr1, fr3 = kernels.predict_batch(vf, 50.0, 0.75, 40.0, 2000.0, batch_size=4)
+    assert fr1.shape == fr3.shape == (2, 3)
+    np.testing.assert_allclose(fr1, np.maximum(fr1_baseline(vf, 50.0, 0.75, 40.0), 0.0), rtol=1e-12)
+
+
+def test_predict_batch_rejects_other_dtypes():
+    with pytest.raises(ValueError):
+        kernels.predict_batch(0.01, 50.0, 0.75, 40.0, 2000.0, dtype=np.float16)
+
+
+def test_validate_batch_flags_each_constraint():
+    assert kernels.BATCH_CONSTRAINTS == ("vf_dec", "fc", "lambda_f", "ffu")
+    # One row inside every range, then one row per violated constraint
+    vf = np.array([0.01, 0.03, 0.01, 0.01, 0.01])
+    lf = np.array([50.0, 50.0, 50.0, 50.0, 50.0])
+    df = np.array([0.75, 0.75, 0.75, 0.25, 0.75])
+    fc = np.array([40.0, 40.0, 90.0, 40.0, 40.0])
+    ffu = np.array([2000.0, 2000.0, 2000.0, 2000.0, 500.0])
+    mask = kernels.validate_batch(vf, lf, df, fc, ffu)
+    assert mask.shape == (5, 4) and mask.dtype == bool
+    np.testing.assert_array_equal(mask, np.vstack([np.ones(4, bool), ~np.eye(4, dtype=bool)]))
+    # Rows with any violation
+    np.testing.assert_array_equal(~np.logical_and.reduce(mask, axis=-1), [False, True, True, True, True])
+
+
+def test_validate_batch_includes_the_limits():
+    mask = kernels.validate_batch(VF_DEC_MIN, LAMBDA_MAX, 1.0, FC_MAX, FFU_MIN)
+    assert mask.shape == (4,)
+    assert mask.all()
+
+
+def test_validate_batch_broadcasts_inputs():
+    fc = np.array([[20.0], [40.0], [80.0]])
+    ffu = np.array([900.0, 2000.0])
+    mask = kernels.validate_batch(0.01, 50.0, 0.75, fc, ffu)
+    assert mask.shape == (3, 2, 4)
+    np.testing.assert_array_equal(mask[..., 1], np.broadcast_to([[False], [True], [False]], (3, 2)))
+    np.testing.assert_array_equal(mask[..., 3], np.broadcast_to([False, True], (3, 2)))
+
+
+def test_validate_batch_rejects_zero_diameter_and_nan():
+    mask = kernels.validate_batch(
+        np.array([0.01, 0.01, np.nan]), 50.0, np.array([0.0, np.nan, 0.75]), 40.0, 2000.0
+    )
+    np.testing.assert_array_equal(mask[:, 2], [False, False, True])
+    np.testing.assert_array_equal(mask[:, 0], [True, True, False])
+    assert not np.logical_and.reduce(mask, axis=-1).any()
+
+
+@pytest.mark.parametrize("dtype, rtol", [(np.float64, 1e-12), (np.float32, 1e-4)])
+def test_predict_soa_round_trips_a_dataframe(dtype, rtol):
+    pd = pytest.importorskip("pandas")
+    vf, lf, df, fc, ffu = sample_arrays(n=50)
+    # Integer columns as read from a CSV of whole-number inputs
+    frame = pd.DataFrame(
+        {"vf_dec": vf, "lf_mm": lf.round().astype(int), "df_mm": df, "fc_mpa": fc.round().astype(int), "ffu_mpa": 2000}
+    )
+    soa = kernels.df_to_soa(frame)
+    assert all(soa[c].dtype == np.float64 and soa[c].flags.c_contiguous for c in kernels.SOA_COLUMNS)
+
+    frame["fR1"], frame["fR3"] = kernels.predict_soa(**soa, dtype=dtype)
+    assert frame["fR1"].dtype == dtype and frame["fR3"].dtype == dtype
+    lf, fc = frame["lf_mm"].to_numpy(float), frame["fc_mpa"].to_numpy(float)
+    np.testing.assert_allclose(frame["fR1"], np.maximum(fr1_baseline(vf, lf, df, fc), 0.0), rtol=rtol)
+    np.testing.assert_allclose(frame["fR3"], np.maximum(fr3_baseline(vf, lf, df, fc, 2000.0), 0.0), rtol=rtol)
+
+
+def test_kernel_cache_is_keyed_without_changing_numba_config():
+    import numba
+
+    assert numba.config.CACHE_DIR != kernels._CACHE_DIR
+    kernels.fr1_pred(np.array([0.01]), 50.0 / 0.75, 40.0)
+    cached = [f for _, _, files in os.walk(kernels._CACHE_DIR) for f in files if f.endswith(".nbi")]
+    assert any("_fr1_scalar" in f for f in cached) and any("_fr1_elementwise" in f for f in cached)